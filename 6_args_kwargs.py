@@ -11,9 +11,10 @@ def foo(required, *args, **kwargs):
         # you can also access individual kwarg using the below syntax
         # print(kwargs['key1'])
 
-foo('hello')
-foo('world', 1 ,2, 3)
-foo('hello world', 3, 4, 5, key1 = 'Hi', key2 = 'There')
+if __name__ == '__main__':
+    foo('hello')
+    foo('world', 1 ,2, 3)
+    foo('hello world', 3, 4, 5, key1 = 'Hi', key2 = 'There')
 
 # I want to make it clear that calling the parameters args and kwargs is
 # simply a naming convention. The previous example would work just
@@ -0,0 +1,262 @@
+# Measuring instead of guessing
+# Several lessons make claims about speed: deep decorator stacking adds
+# nested calls, f-strings are supposed to be the fastest way to format a
+# string, comprehensions beat for-loops, and so on. This script measures
+# those claims with timeit, so changes can be judged on numbers.
+# Each benchmark is timed a few times and the fastest run counts (the
+# slower runs are just other things getting in the way). The results are
+# nanoseconds per call, written as JSON. Save one run as a baseline, and
+# later runs are compared against it: anything slower by more than the
+# threshold is flagged as a regression and the script exits with 1.
+#     python benchmarks.py --save-baseline baseline.json
+#     python benchmarks.py --baseline baseline.json --output results.json
+#     python benchmarks.py --filter format
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from array import array
+from string import Template
+
+import decorators_
+import effective_functions
+import literal_string_interpolation
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def hello():
+    return 'Hello'
+
+
+def _stack(depth):
+    decorators = [decorators_.strong, decorators_.emphasis, decorators_.uppercase] * depth
+    return decorators[:depth]
+
+
+def _nested(depth):
+    func = hello
+    for deco in reversed(_stack(depth)):
+        func = deco(func)
+    return func
+
+
+for _depth in (1, 3, 6):
+    benchmark(f'decorators.nested.depth{_depth}')(_nested(_depth))
+    benchmark(f'decorators.compose.depth{_depth}')(decorators_.compose(*_stack(_depth))(hello))
+
+name, question, errno = 'Bob', 'going', 50159747054
+template = Template('Hey $name, there is a $error error!')
+
+
+@benchmark('format.fstring')
+def format_fstring():
+    return f'Hey {name}, there is a {errno:#x} error!'
+
+
+@benchmark('format.concat')
+def format_concat():
+    return 'Hey ' + name + ', there is a ' + hex(errno) + ' error!'
+
+
+@benchmark('format.percent')
+def format_percent():
+    return 'Hey %s, there is a 0x%x error!' % (name, errno)
+
+
+@benchmark('format.str_format')
+def format_str_format():
+    return 'Hey {}, there is a {:#x} error!'.format(name, errno)
+
+
+@benchmark('format.template')
+def format_template():
+    return template.substitute(name=name, error=hex(errno))
+
+
+compiled_template = literal_string_interpolation.compile_template('Hey $name, there is a $error error!')
+
+
+@benchmark('format.render')
+def format_render():
+    return literal_string_interpolation.render('Hey $name, there is a $error error!',
+                                               name=name, error=hex(errno))
+
+
+@benchmark('format.compiled_template')
+def format_compiled_template():
+    return compiled_template.render(name=name, error=hex(errno))
+
+
+template_rows = [{'name': str(i), 'error': hex(errno + i)} for i in range(1000)]
+
+benchmark('format.template_many')(lambda: [template.substitute(row) for row in template_rows])
+benchmark('format.compiled_template_many')(lambda: list(compiled_template.render_many(template_rows)))
+
+
+log_rows = [{'errno': 50159747054 + i, 'latency': i / 7} for i in range(1000)]
+log_format = literal_string_interpolation.compile_format('error {errno:#x} after {latency:.3f}s')
+
+benchmark('logformat.str_format')(
+    lambda: '\n'.join(['error {errno:#x} after {latency:.3f}s'.format(**row) for row in log_rows]))
+benchmark('logformat.percent')(
+    lambda: '\n'.join(['error %#x after %.3fs' % (row['errno'], row['latency']) for row in log_rows]))
+benchmark('logformat.fstring')(
+    lambda: '\n'.join([f"error {row['errno']:#x} after {row['latency']:.3f}s" for row in log_rows]))
+benchmark('logformat.compiled')(lambda: log_format.render_many(log_rows))
+
+
+numbers = range(1000)
+
+
+@benchmark('loops.list_comprehension')
+def loops_list_comprehension():
+    return sum([x * x for x in numbers if x % 2 == 0])
+
+
+@benchmark('loops.for_loop')
+def loops_for_loop():
+    squares = []
+    for x in numbers:
+        if x % 2 == 0:
+            squares.append(x * x)
+    return sum(squares)
+
+
+@benchmark('loops.generator')
+def loops_generator():
+    return sum(x * x for x in numbers if x % 2 == 0)
+
+
+plus_5_closure = effective_functions.make_adder(5)
+plus_5_object = effective_functions.Adder.__new__(effective_functions.Adder)  # __init__ prints
+plus_5_object.n = 5
+plus_5_compact = effective_functions.CompactAdder(5)
+
+benchmark('callables.closure')(lambda: plus_5_closure(4))
+benchmark('callables.call_method')(lambda: plus_5_object(4))
+benchmark('callables.slots_call_method')(lambda: plus_5_compact(4))
+
+
+# args_kwargs.foo() prints, so we forward to a quiet function with the
+# same signature instead.
+def quiet_foo(required, *args, **kwargs):
+    return required
+
+
+def forward_exact(required, key1=None):
+    return quiet_foo(required, key1=key1)
+
+
+def forward_args_kwargs(*args, **kwargs):
+    return quiet_foo(*args, **kwargs)
+
+
+benchmark('forwarding.direct')(lambda: quiet_foo('hello', key1='Hi'))
+benchmark('forwarding.exact_signature')(lambda: forward_exact('hello', key1='Hi'))
+benchmark('forwarding.args_kwargs')(lambda: forward_args_kwargs('hello', key1='Hi'))
+
+
+def greet(name, question='going'):
+    return f"Hello, {name}! How's it {question}?"
+
+
+def generic_uppercase(func):
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs).upper()
+    return wrapper
+
+
+generic_greet = generic_uppercase(greet)
+exact_greet = decorators_.uppercase(greet)
+
+benchmark('forwarding.generic_decorator')(lambda: generic_greet('Bob', question='hanging'))
+benchmark('forwarding.exact_decorator')(lambda: exact_greet('Bob', question='hanging'))
+
+
+messages = [f'message number {i}' for i in range(1000)]
+message_data = ''.join(messages).encode()
+message_offsets = array('q', [0])
+for _message in messages:
+    message_offsets.append(message_offsets[-1] + len(_message))
+
+benchmark('text.yell_per_call')(lambda: [effective_functions.shout(m) for m in messages])
+benchmark('text.yell_batch')(lambda: effective_functions.yell_batch(messages))
+benchmark('text.upper_per_call')(lambda: [m.upper() for m in messages])
+benchmark('text.upper_buffer')(lambda: effective_functions.transform_buffer(message_offsets, message_data))
+benchmark('text.yell_buffer')(
+    lambda: effective_functions.transform_buffer(message_offsets, message_data, 'upper', b'!'))
+
+
+def run(names, repeat=5):
+    results = {}
+    for name in names:
+        timer = timeit.Timer(BENCHMARKS[name])
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = best / number * 1e9
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, ns in results.items():
+        before = baseline.get(name)
+        if before is not None and ns > before * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmarks for the lessons in this repo.')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against results stored in this file')
+    parser.add_argument('--save-baseline', help='store these results as a baseline in this file')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='slowdown (0.10 = 10%%) that counts as a regression')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.repeat)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+
+    for name, ns in results.items():
+        line = f'{name:36} {ns:10.1f} ns'
+        if name in baseline:
+            line += f'  {ns / baseline[name]:6.2f}x baseline'
+            if name in regressions:
+                line += '  REGRESSION'
+        print(line)
+
+    report = {
+        'python': sys.version,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
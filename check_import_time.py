@@ -0,0 +1,70 @@
+# Keeping imports cheap
+# Importing a module runs all of its top-level code. That's why the
+# lessons keep their examples behind if __name__ == '__main__': and import
+# heavy things like numpy or concurrent.futures only inside the functions
+# that need them.
+# This script makes sure it stays that way. It imports every lesson in a
+# fresh interpreter with `python -X importtime`, which prints how long
+# each import took (in microseconds), and complains about any lesson
+# that takes longer than the budget. Each import is measured a few
+# times and the fastest run counts, to keep the numbers from jumping
+# around too much.
+#     python check_import_time.py
+#     python check_import_time.py --budget-ms 20 --repeat 10
+
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = [
+    '6_args_kwargs',
+    'decorators_',
+    'effective_functions',
+    'function_pipeline',
+    'list_comprehension',
+    'literal_string_interpolation',
+    'main_assert',
+    'product_catalog',
+    'safe_expressions',
+    'zen_of_python',
+    'tricks',
+]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_time_us(module):
+    # __import__ instead of importlib.import_module: -X importtime only
+    # reports imports that go through the regular import machinery.
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'__import__({module!r})'],
+        capture_output=True, text=True, check=True, cwd=HERE)
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f'no import time reported for {module}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check how long each lesson takes to import.')
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    failed = []
+    for module in MODULES:
+        ms = min(import_time_us(module) for _ in range(args.repeat)) / 1000
+        verdict = 'ok' if ms <= args.budget_ms else 'TOO SLOW'
+        print(f'{module:32} {ms:8.2f} ms  {verdict}')
+        if ms > args.budget_ms:
+            failed.append(module)
+    if failed:
+        print(f'over the {args.budget_ms} ms budget: {", ".join(failed)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
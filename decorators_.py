@@ -23,7 +23,8 @@ def greet():
     return 'Hello!'
 
 greet = null_decorator(greet)
-print(greet())
+if __name__ == '__main__':
+    print(greet())
 
 # Instead of explicitly calling null_decorator on greet and then reassigning the greet variable, you can use Python’s @ syntax for decorating a function more conveniently:
 
@@ -31,7 +32,8 @@ print(greet())
 def greet():
     return 'Hi'
 
-print(greet())
+if __name__ == '__main__':
+    print(greet())
 
 # Putting an @null_decorator line in front of the function definition is
 # the same as defining the function first and then running through the
@@ -61,7 +63,8 @@ def uppercase(func):
 @uppercase
 def greet():
     return "Hi I have been decorated"
-print(greet())
+if __name__ == '__main__':
+    print(greet())
 
 # And as you saw earlier, it needs to do that in order to modify the
 # behavior of the decorated function when it finally gets called. The
@@ -96,7 +99,8 @@ def emphasis(func):
 def greet():
     return("Hello")
 
-print(greet())
+if __name__ == '__main__':
+    print(greet())
 
 # This clearly shows in what order the decorators were applied: from
 # bottom to top. First, the input function was wrapped by the @emphasis
@@ -179,3 +183,697 @@ decorated_greet = strong(emphasis(greet))
 
 
 
+# 4. Wrappers That Take Arguments
+# All the wrappers so far are defined as wrapper() and call func(), so
+# they only work for functions without arguments. The usual fix is the
+# *args and **kwargs trick from 6_args_kwargs.py:
+#     def wrapper(*args, **kwargs):
+#         return func(*args, **kwargs)
+# That accepts anything and forwards it, but it costs something on every
+# call: the arguments are packed into a tuple and a dict, and unpacked
+# again for func. Run benchmarks.py and compare forwarding.args_kwargs
+# with forwarding.exact_signature to see how much.
+# exact_wrapper avoids that by writing the wrapper's source code for us,
+# with exactly the same parameters as func (read with inspect.signature),
+# and compiling it with exec. For greet(name, question='going') the
+# wrapper it builds looks like
+#     def wrapper(name, question=_default_question):
+#         return _modify(_func(name, question))
+# You give it the body of the wrapper with {call} where the call to func
+# should go, plus the names the body uses. If func's signature can't be
+# read, or one of its parameter names clashes with a name in the body,
+# it falls back to *args and **kwargs.
+
+import functools
+import inspect
+import re
+
+
+def _signature_source(func, body, names):
+    try:
+        signature = inspect.signature(func, follow_wrapped=False)
+    except (TypeError, ValueError):
+        return None
+    params, call, defaults = [], [], {}
+    positional_only = 0
+    seen_star = False
+    for param in signature.parameters.values():
+        name = param.name
+        if name in names or name.startswith('_default_') or re.search(rf'\b{name}\b', body):
+            return None
+        if param.kind is param.VAR_POSITIONAL:
+            params.append('*' + name)
+            call.append('*' + name)
+            seen_star = True
+            continue
+        if param.kind is param.VAR_KEYWORD:
+            params.append('**' + name)
+            call.append('**' + name)
+            continue
+        if param.kind is param.KEYWORD_ONLY and not seen_star:
+            params.append('*')
+            seen_star = True
+        if param.kind is param.POSITIONAL_ONLY:
+            positional_only += 1
+        if param.default is param.empty:
+            params.append(name)
+        else:
+            defaults['_default_' + name] = param.default
+            params.append(f'{name}=_default_{name}')
+        call.append(f'{name}={name}' if param.kind is param.KEYWORD_ONLY else name)
+    if positional_only:
+        params.insert(positional_only, '/')
+    return ', '.join(params), ', '.join(call), defaults
+
+
+def exact_wrapper(func, body, asynchronous=False, **names):
+    namespace = {'_func': func, **names}
+    source = _signature_source(func, body, namespace)
+    if source is None:
+        params, call = '*args, **kwargs', '*args, **kwargs'
+    else:
+        params, call, defaults = source
+        namespace.update(defaults)
+    lines = body.replace('{call}', f'_func({call})').splitlines()
+    code = (('async def' if asynchronous else 'def') + f' wrapper({params}):\n'
+            + ''.join(f'    {line}\n' for line in lines))
+    exec(code, namespace)
+    return functools.update_wrapper(namespace['wrapper'], func)
+
+def greet(name, question='going'):
+    return f"Hello, {name}! How's it {question}?"
+
+shouting_greet = exact_wrapper(greet, 'return _modify({call})', _modify=str.upper)
+if __name__ == '__main__':
+    print(shouting_greet('Bob', question='hanging'))
+    print(inspect.signature(shouting_greet))
+
+
+# 5. Decorating Coroutines
+# The wrappers above call func() and work on the result straight away. If
+# you decorate an `async def` function, func() only gives you back a
+# coroutine object, so uppercase would try to call .upper() on it and
+# strong would try to add strings to it. An async function needs an async
+# wrapper that awaits the result first, and an async generator needs a
+# wrapper that modifies every item it yields.
+# So here are uppercase, strong and emphasis again, this time checking
+# what kind of function they got and returning a matching wrapper. The
+# async wrappers are plain coroutines, so a stack of mixed sync and async
+# decorators stays on the event loop without handing anything off to a
+# thread.
+
+def is_async(func):
+    return inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+
+
+def result_wrapper(func, modify):
+    if inspect.isasyncgenfunction(func):
+        return exact_wrapper(func, 'async for item in {call}:\n    yield _modify(item)',
+                             asynchronous=True, _modify=modify)
+    if inspect.iscoroutinefunction(func):
+        return exact_wrapper(func, 'return _modify(await {call})', asynchronous=True, _modify=modify)
+    return exact_wrapper(func, 'return _modify({call})', _modify=modify)
+
+
+def uppercase(func):
+    return result_wrapper(func, str.upper)
+
+def strong(func):
+    return result_wrapper(func, lambda result: '<strong>' + result + '</strong>')
+
+def emphasis(func):
+    return result_wrapper(func, lambda result: '<em>' + result + '</em>')
+
+# null_decorator needs no changes, it hands back whatever it was given.
+
+@strong
+@uppercase
+async def greet():
+    return 'Hello'
+
+if __name__ == '__main__':
+    import asyncio
+    print(asyncio.run(greet()))
+
+
+# 6. Flattening a Decorator Stack
+# Remember the note about deep decorator stacking? Every layer of
+# @strong, @emphasis or @uppercase adds one more nested wrapper call. But
+# these decorators are all of the same simple shape: they put a prefix in
+# front of the result, a suffix after it, or transform it (uppercase).
+# So instead of nesting the wrappers we can work out up front what the
+# whole stack would produce and build a single wrapper that does it in
+# one step.
+
+# (prefix, suffix, transform) for the simple string decorators above.
+# A transform has to work character by character (like str.upper), so
+# that applying it to prefix + result + suffix is the same as applying it
+# to each of the three pieces separately.
+STRING_DECORATORS = {
+    uppercase: ('', '', str.upper),
+    strong: ('<strong>', '</strong>', None),
+    emphasis: ('<em>', '</em>', None),
+}
+
+# Applying one of these twice gives the same as applying it once, so a
+# stack with several @uppercase layers still needs only one call.
+IDEMPOTENT_TRANSFORMS = {str.upper, str.lower, str.casefold}
+
+
+def _flat_wrapper(func, prefix, suffix, transforms):
+    if not prefix and not suffix and not transforms:
+        return func
+    if is_async(func):
+        def modify(result):
+            for transform in transforms:
+                result = transform(result)
+            return prefix + result + suffix
+        return result_wrapper(func, modify)
+    if not transforms:
+        body = 'return _prefix + {call} + _suffix'
+    elif len(transforms) == 1:
+        body = 'return _prefix + _transform({call}) + _suffix'
+    else:
+        body = ('_result = {call}\n'
+                'for _each in _transforms:\n'
+                '    _result = _each(_result)\n'
+                'return _prefix + _result + _suffix')
+    return exact_wrapper(func, body, _prefix=prefix, _suffix=suffix,
+                         _transform=transforms[0] if transforms else None,
+                         _transforms=transforms)
+
+
+def compose(*decorators):
+    # compose(strong, emphasis) does the same as stacking @strong on top of
+    # @emphasis, so we walk the stack from the bottom up just like Python
+    # does. Decorators we don't know how to flatten are applied normally.
+    def decorator(func):
+        prefix, suffix, transforms = '', '', []
+        for deco in reversed(decorators):
+            if deco not in STRING_DECORATORS:
+                func = deco(_flat_wrapper(func, prefix, suffix, transforms))
+                prefix, suffix, transforms = '', '', []
+                continue
+            deco_prefix, deco_suffix, transform = STRING_DECORATORS[deco]
+            if transform is not None:
+                prefix, suffix = transform(prefix), transform(suffix)
+                if not (transforms and transforms[-1] is transform
+                        and transform in IDEMPOTENT_TRANSFORMS):
+                    transforms.append(transform)
+            prefix, suffix = deco_prefix + prefix, suffix + deco_suffix
+        return _flat_wrapper(func, prefix, suffix, tuple(transforms))
+    return decorator
+
+@compose(strong, emphasis, uppercase)
+def greet():
+    """Return a friendly greeting."""
+    return 'Hello'
+
+if __name__ == '__main__':
+    print(greet())
+    print(greet.__name__, greet.__doc__)
+
+# You can check with timeit that the cost of a call no longer grows with
+# the height of the stack:
+# import timeit
+# def hello():
+#     return 'Hello'
+# for depth in (1, 3, 6):
+#     stack = [strong, emphasis, uppercase] * 2
+#     nested = hello
+#     for deco in reversed(stack[:depth]):
+#         nested = deco(nested)
+#     flat = compose(*stack[:depth])(hello)
+#     print(depth, timeit.timeit(nested, number=1_000_000),
+#           timeit.timeit(flat, number=1_000_000))
+
+
+# 7. Caching Decorators
+# Decorators are also a handy place to put caching. If a function is pure
+# (same arguments in, same result out) there's no need to compute the
+# same result twice: the wrapper can remember results by their arguments
+# and hand back the stored value on the next call.
+# The cache key is built from *args and **kwargs, in the same shape as
+# foo(required, *args, **kwargs) in 6_args_kwargs.py. The cache is
+# bounded, either by number of entries (maxsize) or by the approximate
+# size of the stored results (maxbytes), and the least recently used
+# entry is evicted first (a single result bigger than maxbytes is never
+# stored at all). With ttl set, entries also expire after that many
+# seconds.
+# By default sizes are measured with sys.getsizeof, which only counts the
+# object itself: right for str, bytes and numbers, but a list of a million
+# strings counts as just its array of pointers, and keys aren't counted at
+# all. For results that hold other objects pass your own sizeof=, e.g. one
+# that adds up the items, or an ndarray's .nbytes.
+# With thread_safe=True, concurrent calls with the same arguments compute
+# the result only once: the first caller does the work and the others
+# wait for it.
+
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from types import MethodType
+
+CacheStats = namedtuple('CacheStats', 'hits misses evictions size nbytes')
+
+_KWARGS_MARK = object()
+
+
+def make_key(args, kwargs):
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    return key
+
+
+class Memoized:
+    def __init__(self, func, maxsize=128, maxbytes=None, ttl=None, thread_safe=False,
+                 sizeof=sys.getsizeof):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, expires, nbytes)
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock() if thread_safe else None
+        self._pending = {}
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires, nbytes = entry
+        if expires is not None and expires <= time.monotonic():
+            del self._entries[key]
+            self._nbytes -= nbytes
+            self._evictions += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        nbytes = self.sizeof(value) if self.maxbytes is not None else 0
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._nbytes -= old[2]
+        if self.maxbytes is not None and nbytes > self.maxbytes:
+            # It would push out everything else and still not fit.
+            return
+        self._entries[key] = (value, expires, nbytes)
+        self._nbytes += nbytes
+        while self._entries and (
+                (self.maxsize is not None and len(self._entries) > self.maxsize)
+                or (self.maxbytes is not None and self._nbytes > self.maxbytes)):
+            _, (_, _, evicted_nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_nbytes
+            self._evictions += 1
+
+    def __get__(self, instance, owner=None):
+        # Used on a method, self is passed on like any other argument, so
+        # every instance gets its own cache entries.
+        if instance is None:
+            return self
+        return MethodType(self, instance)
+
+    def __call__(self, *args, **kwargs):
+        key = make_key(args, kwargs)
+        if self._lock is None:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            self._misses += 1
+            value = self.func(*args, **kwargs)
+            self._store(key, value)
+            return value
+
+        while True:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self._hits += 1
+                    return value
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self._misses += 1
+                    break
+            # Someone else is computing this key right now, wait for them
+            # and then look again.
+            event.wait()
+        try:
+            value = self.func(*args, **kwargs)
+            with self._lock:
+                self._store(key, value)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            event.set()
+        return value
+
+    async def call_async(self, *args, **kwargs):
+        # On the event loop there's no need for a lock, but concurrent tasks
+        # asking for the same key should still share one computation.
+        import asyncio
+        key = make_key(args, kwargs)
+        while True:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = asyncio.get_running_loop().create_future()
+                self._misses += 1
+                break
+            await asyncio.shield(pending)
+        try:
+            value = await self.func(*args, **kwargs)
+            self._store(key, value)
+        finally:
+            del self._pending[key]
+            pending.set_result(None)
+        return value
+
+    def stats(self):
+        return CacheStats(self._hits, self._misses, self._evictions,
+                          len(self._entries), self._nbytes)
+
+    def cache_clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+
+
+def memoize(maxsize=128, maxbytes=None, ttl=None, thread_safe=False, sizeof=sys.getsizeof):
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            raise TypeError('memoize cannot cache async generators')
+        memoized = Memoized(func, maxsize, maxbytes, ttl, thread_safe, sizeof)
+        if not inspect.iscoroutinefunction(func):
+            return memoized
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await memoized.call_async(*args, **kwargs)
+        wrapper.stats = memoized.stats
+        wrapper.cache_clear = memoized.cache_clear
+        return wrapper
+    return decorator
+
+@memoize(maxsize=2)
+def shout(text, times=1):
+    return (text.upper() + '!') * times
+
+if __name__ == '__main__':
+    shout('hey')
+    shout('hey')
+    shout('hey', times=2)
+    shout('ho')
+    print(shout.stats())
+
+# Careful: the cache holds on to every key and result until it's evicted,
+# so only memoize functions without side effects, and keep the bounds
+# small enough for your memory budget.
+
+
+# 8. Instrumentation Decorators
+# "Logging and other instrumentation" was one of the examples of what
+# decorators are good for. Here's a timing decorator you can leave on in
+# production: @instrument(sample_rate=0.01) times one call in a hundred
+# and counts its latency into a histogram (bucket i counts calls that
+# took less than 2**i nanoseconds).
+# To keep it cheap, every thread counts into its own histogram, so the
+# hot path never takes a lock. The histograms are never reset either,
+# flush() just adds up the current totals and hands them to the sink:
+# either a callable that gets a dict, or a file path that gets one JSON
+# line per flush. That happens by itself every flush_interval seconds
+# (checked on sampled calls), or whenever you call flush() yourself.
+# Calls that aren't sampled only pay for counting down to the next
+# sample, and with sample_rate=0 nothing is ever timed.
+
+import json
+
+HISTOGRAM_BUCKETS = 64
+
+
+class CallStats:
+    def __init__(self, name, sink=None, flush_interval=60.0):
+        self.name = name
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._histograms = []
+        self._last_flush = time.monotonic()
+
+    def record(self, elapsed_ns):
+        try:
+            histogram = self._local.histogram
+        except AttributeError:
+            histogram = self._local.histogram = [0] * HISTOGRAM_BUCKETS
+            # list.append is atomic, no lock needed.
+            self._histograms.append(histogram)
+        histogram[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        if self.sink is not None and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def histogram(self):
+        return [sum(counts) for counts in zip(*self._histograms)] or [0] * HISTOGRAM_BUCKETS
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        histogram = self.histogram()
+        report = {
+            'function': self.name,
+            'time': time.time(),
+            'samples': sum(histogram),
+            'histogram_ns': {2 ** i: count for i, count in enumerate(histogram) if count},
+        }
+        if callable(self.sink):
+            self.sink(report)
+        elif self.sink is not None:
+            with open(self.sink, 'a') as f:
+                f.write(json.dumps(report) + '\n')
+        return report
+
+
+_INSTRUMENTED_BODY = """\
+global _countdown
+_countdown -= 1
+if _countdown:
+    return {call}
+_countdown = _period
+_start = _perf_counter_ns()
+try:
+    return {call}
+finally:
+    _record(_perf_counter_ns() - _start)"""
+
+
+def _sample_period(rate):
+    if not 0 <= rate <= 1:
+        raise ValueError(f'sample rate must be between 0 and 1, not {rate!r}')
+    return round(1 / rate) if rate else 0
+
+
+def instrument(sample_rate=0.01, sink=None, flush_interval=60.0):
+    # The wrapper is built with exact_wrapper, so it doesn't pay for
+    # *args/**kwargs packing either. Each generated wrapper has its own
+    # globals, which is where its countdown lives.
+    period = _sample_period(sample_rate)
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            raise TypeError('instrument cannot time async generators')
+        name = getattr(func, '__qualname__', type(func).__qualname__)
+        stats = CallStats(name, sink, flush_interval)
+        asynchronous = inspect.iscoroutinefunction(func)
+        body = _INSTRUMENTED_BODY.replace('{call}', 'await {call}') if asynchronous else _INSTRUMENTED_BODY
+        wrapper = exact_wrapper(func, body, asynchronous, _countdown=period, _period=period,
+                                _perf_counter_ns=time.perf_counter_ns, _record=stats.record)
+
+        def set_sample_rate(rate):
+            # With rate 0 the countdown starts at 0 and goes negative on
+            # the first call, so it never hits 0 (and samples) again.
+            period = _sample_period(rate)
+            wrapper.__globals__.update(_countdown=period, _period=period)
+
+        wrapper.stats = stats
+        wrapper.set_sample_rate = set_sample_rate
+        return wrapper
+    return decorator
+
+# It works on callable objects too, e.g. effective_functions.Adder:
+#     plus_3 = instrument(sample_rate=1.0, sink=print)(Adder(3))
+# or on the class's __call__ method directly.
+if __name__ == '__main__':
+    @instrument(sample_rate=1.0)
+    def slow_greet():
+        time.sleep(0.001)
+        return 'Hello'
+
+    for _ in range(10):
+        slow_greet()
+    print(slow_greet.stats.flush())
+
+
+# 9. Recomputing Only What Changed
+# memoize remembers results by their arguments, which is only correct as
+# long as the function doesn't read anything else. Real rendering code
+# does, though: a heading reads the current title, a page calls the
+# heading, and so on. Here's a decorator that keeps track of that.
+# A Source holds a value that can change, with a version number that goes
+# up whenever it does. While an @incremental function runs, every
+# Source.get() and every call to another @incremental function is
+# recorded as one of its dependencies, together with the version it saw.
+# On the next call with the same arguments the function first checks
+# those dependencies (and, recursively, their dependencies). Only if one
+# of them changed does it run again; otherwise it returns the stored
+# result. And if it runs again but comes up with the same result as
+# before, its own version stays the same, so the functions that depend on
+# it don't have to recompute either.
+# It keeps one result per set of arguments, and never drops any on its
+# own: for functions called with many different arguments, call
+# invalidate(...) or invalidate_all() when you're done with them, or the
+# results pile up. It isn't meant to be called from several threads at
+# once.
+
+_tracking = threading.local()
+
+
+def _record(dependency, key, version):
+    stack = getattr(_tracking, 'stack', None)
+    if stack:
+        stack[-1].append((dependency, key, version))
+
+
+# For these an object that `is` the old one really is the same value.
+_IMMUTABLE = (int, float, complex, bool, str, bytes, type(None))
+
+
+def _same(old, new):
+    # 1 == 1.0 == True, but they aren't interchangeable results.
+    if type(old) is not type(new):
+        return False
+    if old is new:
+        # A list or dict may have been changed in place and set again:
+        #     items.append(5); source.set(items)
+        return type(old) in _IMMUTABLE
+    try:
+        return bool(old == new)
+    except Exception:
+        # e.g. NumPy arrays, where == doesn't give a single True/False
+        return False
+
+
+class Source:
+    def __init__(self, value):
+        self._value = value
+        self.version = 0
+
+    def get(self):
+        _record(self, None, self.version)
+        return self._value
+
+    def set(self, value):
+        changed = not _same(self._value, value)
+        self._value = value
+        if changed:
+            self.version += 1
+
+    def current_version(self, key):
+        return self.version
+
+
+class _Result:
+    __slots__ = ('value', 'version', 'dependencies', 'args', 'kwargs')
+
+    def __init__(self, value, version, dependencies, args, kwargs):
+        self.value = value
+        self.version = version
+        self.dependencies = dependencies
+        self.args = args
+        self.kwargs = kwargs
+
+
+class Incremental:
+    def __init__(self, func):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.recomputations = 0
+        self._results = {}
+
+    def __get__(self, instance, owner=None):
+        # On a method the instance becomes the first argument, so it's part
+        # of the key (and kept alive by the stored result): pass it to
+        # invalidate() too, as in Class.method.invalidate(obj, ...).
+        if instance is None:
+            return self
+        return MethodType(self, instance)
+
+    def __call__(self, *args, **kwargs):
+        key = make_key(args, kwargs)
+        result = self._refresh(key, args, kwargs)
+        _record(self, key, result.version)
+        return result.value
+
+    def _refresh(self, key, args, kwargs):
+        result = self._results.get(key)
+        if result is not None and all(dependency.current_version(dependency_key) == version
+                                      for dependency, dependency_key, version in result.dependencies):
+            return result
+        if not hasattr(_tracking, 'stack'):
+            _tracking.stack = []
+        _tracking.stack.append([])
+        try:
+            value = self.func(*args, **kwargs)
+        finally:
+            dependencies = _tracking.stack.pop()
+        self.recomputations += 1
+        if result is not None and _same(result.value, value):
+            result.dependencies = dependencies
+            return result
+        version = result.version + 1 if result is not None else 0
+        result = self._results[key] = _Result(value, version, dependencies, args, kwargs)
+        return result
+
+    def current_version(self, key):
+        result = self._results.get(key)
+        if result is None:
+            # Invalidated: the caller has to run again and call us anew.
+            return None
+        return self._refresh(key, result.args, result.kwargs).version
+
+    def invalidate(self, *args, **kwargs):
+        self._results.pop(make_key(args, kwargs), None)
+
+    def invalidate_all(self):
+        self._results.clear()
+
+
+def incremental(func):
+    return Incremental(func)
+
+title = Source('Hello')
+
+@incremental
+@uppercase
+def heading():
+    return title.get()
+
+@incremental
+def page(name):
+    return f'{heading()}, {name}!'
+
+if __name__ == '__main__':
+    page('Bob')
+    page('Bob')                # nothing changed, nothing runs
+    title.set('Hello')         # same value, nothing to do
+    print(page('Bob'), page.recomputations, heading.recomputations)
+    title.set('Howdy')
+    print(page('Bob'), page.recomputations, heading.recomputations)
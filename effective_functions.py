@@ -3,16 +3,19 @@
 # just like how strings, lists, modules, are all objects in python, likewise functions are first class objects as well
 
 def yell(text):
-    print(text.upper() + '!')
-    return text.upper() + '!'
+    result = text.upper() + '!'
+    print(result)
+    return result
 
-yell('hello')
+if __name__ == '__main__':
+    yell('hello')
 
 # Because the yell function is an object in Python, you can assign it to
 # another variable, just like any other object:
 
 bark = yell
-bark('Wow')
+if __name__ == '__main__':
+    bark('Wow')
 
 # Function objects and their names are two separate concerns. Here’s
 # more proof: You can delete the function’s original name (yell). Since
@@ -56,7 +59,8 @@ def greet(func):
     greeting = func('Hi, I am a Python program')
     print(greeting)
 
-greet(bark)
+if __name__ == '__main__':
+    greet(bark)
 
 # Functions Can be Nested
 def speak(text):
@@ -64,7 +68,8 @@ def speak(text):
         return t.lower() + '....'
     return whisper(text)
 
-speak("Hi there")
+if __name__ == '__main__':
+    speak("Hi there")
 #it is good to note that, the inner function whisper() does not exist
 # outside speak ()
 
@@ -97,8 +102,9 @@ def make_adder(n):
         return x + n
     return add
 
-plus_5 = make_adder(5)
-print(plus_5(4))
+if __name__ == '__main__':
+    plus_5 = make_adder(5)
+    print(plus_5(4))
 
 
 
@@ -117,16 +123,249 @@ class Adder:
     def __call__(self, x):
         return self.n + x
 
-plus_3 = Adder(3)
-a = plus_3(4)
-print(a)
+if __name__ == '__main__':
+    plus_3 = Adder(3)
+    a = plus_3(4)
+    print(a)
 # Behind the scenes, “calling” an object instance as a function attempts
 # to execute the object’s __call__ method.
 
 # Of course, not all objects will be callable. That’s why there’s a built-in
 # callable function to check whether an object appears to be callable
 # or not:
-print(callable(plus_3))
+if __name__ == '__main__':
+    print(callable(plus_3))
+
+# Making lots of small callables cheaper
+# Both make_adder and Adder are fine when you need a handful of them. If
+# you need millions (say one configured adjuster per customer) the memory
+# adds up: every closure is a function object plus a cell for n, and
+# every Adder instance carries its own __dict__ just to store one number.
+# Declaring __slots__ tells Python exactly which attributes an instance
+# will have, so it can store them in a fixed slot instead of a dict.
+# And if all you really need is "add n_i to x", you don't need one object
+# per adder at all: AdderTable keeps all the n values in a single
+# array('q') and applies them to a whole vector of inputs in one call.
+
+import operator
+import sys
+from array import array
+
+
+class CompactAdder:
+    __slots__ = ('n',)
+
+    def __init__(self, n):
+        self.n = n
+
+    def __call__(self, x):
+        return self.n + x
+
+
+class AdderTable:
+    def __init__(self, ns=(), typecode='q'):
+        self.ns = array(typecode, ns)
+
+    def __len__(self):
+        return len(self.ns)
+
+    def __getitem__(self, index):
+        return CompactAdder(self.ns[index])
+
+    def append(self, n):
+        self.ns.append(n)
+        return len(self.ns) - 1
+
+    def apply(self, xs):
+        # xs[i] goes through adder i
+        if len(xs) != len(self.ns):
+            raise ValueError('need exactly one input per adder')
+        # If xs is a NumPy array then NumPy has already been imported.
+        np = sys.modules.get('numpy')
+        if np is not None and isinstance(xs, np.ndarray):
+            return xs + np.frombuffer(self.ns, dtype=self.ns.typecode)
+        return array(self.ns.typecode, map(operator.add, self.ns, xs))
+
+    def apply_indexed(self, indexes, xs):
+        # xs[i] goes through adder indexes[i]
+        ns = self.ns
+        np = sys.modules.get('numpy')
+        if np is not None and isinstance(xs, np.ndarray):
+            return xs + np.frombuffer(ns, dtype=ns.typecode)[np.asarray(indexes)]
+        return array(ns.typecode, [ns[i] + x for i, x in zip(indexes, xs)])
+
+if __name__ == '__main__':
+    adders = AdderTable([5, 3, 10])
+    print(adders[1](4), adders.apply([4, 4, 4]).tolist())
+
+# Compare how much memory a million of each one takes:
+# (Adder.__init__ prints n, so we skip it and set n by hand.)
+# import tracemalloc
+# def quiet_adder(n):
+#     adder = Adder.__new__(Adder)
+#     adder.n = n
+#     return adder
+# for name, build in [('closure', lambda: [make_adder(n) for n in range(10**6)]),
+#                     ('Adder', lambda: [quiet_adder(n) for n in range(10**6)]),
+#                     ('CompactAdder', lambda: [CompactAdder(n) for n in range(10**6)]),
+#                     ('AdderTable', lambda: AdderTable(range(10**6)))]:
+#     tracemalloc.start()
+#     keep = build()
+#     print(name, tracemalloc.get_traced_memory()[0])
+#     tracemalloc.stop()
+
+# Picking a behavior without building closures
+# get_speak_func is a nice demo of closures, but every call defines two
+# brand new functions (whisper and yell) just to return one of them. If
+# you only want the spoken text, the transforms don't need to capture
+# anything: they can be defined once and shared, and the volume only
+# has to pick which one to use.
+# SpeakDispatcher keeps the volume thresholds in a sorted list and finds
+# the right transform with bisect, so adding more tiers doesn't add more
+# if-statements. A volume equal to a threshold falls into the lower tier,
+# just like `if volume > 0.5` in get_speak_func.
+
+from bisect import bisect_left
+
+
+def whisper(text):
+    return text.lower() + '...'
+
+def talk(text):
+    return text
+
+def shout(text):
+    return text.upper() + '!'
+
+
+class SpeakDispatcher:
+    def __init__(self, thresholds=(0.5,), transforms=(whisper, shout)):
+        if len(transforms) != len(thresholds) + 1:
+            raise ValueError('need exactly one more transform than thresholds')
+        if list(thresholds) != sorted(thresholds):
+            raise ValueError('thresholds must be sorted')
+        self.thresholds = list(thresholds)
+        self.transforms = tuple(transforms)
+
+    def transform_for(self, volume):
+        return self.transforms[bisect_left(self.thresholds, volume)]
+
+    def speak(self, text, volume):
+        return self.transforms[bisect_left(self.thresholds, volume)](text)
+
+    def route(self, pairs):
+        thresholds, transforms = self.thresholds, self.transforms
+        return [transforms[bisect_left(thresholds, volume)](text) for text, volume in pairs]
+
+if __name__ == '__main__':
+    speaker = SpeakDispatcher((0.3, 0.7), (whisper, talk, shout))
+    print(speaker.route([('Hello', 0.1), ('Hello', 0.5), ('Hello', 0.9)]))
+
+# Transforming many strings at once
+# yell, the whisper inside speak and the uppercase decorator each handle
+# one string per function call. With tens of millions of short messages
+# the calls add up, so transform_batch converts a whole list in one go:
+# list(map(str.upper, texts)) when there's no suffix, and a single
+# comprehension without any extra function calls when there is one.
+# Every result is still a separate string object though, and creating
+# those is most of the remaining cost. The big win comes from not having
+# separate strings at all: transform_buffer works on an Arrow-style
+# column, one bytes buffer with all the strings back to back plus their
+# offsets (string i is data[offsets[i]:offsets[i + 1]]). If the buffer is
+# pure ASCII, upper() and lower() don't change any lengths, so the whole
+# buffer is converted with one bytes.upper() call and the offsets stay
+# valid. A suffix shifts the offsets by a fixed amount per string; with
+# NumPy that's done for the whole column at once, without it we fall back
+# to slicing the strings out one by one. That fallback is there so the
+# function always works, not for speed: it costs more than calling
+# shout() on every string, so only reach for a suffix on a buffer when
+# NumPy is installed.
+# transform_stream handles an iterator of any length in fixed-size
+# chunks.
+
+import functools
+from itertools import islice
+
+_CASES = {'upper': str.upper, 'lower': str.lower, None: None}
+_BYTE_CASES = {'upper': bytes.upper, 'lower': bytes.lower, None: None}
+
+
+def transform_batch(texts, case='upper', suffix=''):
+    convert = _CASES[case]
+    if convert is None:
+        return [text + suffix for text in texts]
+    if not suffix:
+        return list(map(convert, texts))
+    return [convert(text) + suffix for text in texts]
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    # A failed import isn't remembered: it searches sys.path again every
+    # time, which costs more than a small batch. So ask only once.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _append_suffix(offsets, data, suffix):
+    np = _numpy()
+    if np is None:
+        # String i moves right by i suffixes.
+        offsets = list(offsets)
+        start, step = offsets[0], len(suffix)
+        new_offsets = array('q', map(operator.add, offsets, range(-start, step * len(offsets) - start, step)))
+        pieces = [data[begin:end] for begin, end in zip(offsets, offsets[1:])]
+        return new_offsets, suffix.join(pieces) + suffix if pieces else b''
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    ends = np.cumsum(np.diff(offsets) + len(suffix))
+    new_offsets = np.concatenate((np.zeros(1, dtype=np.int64), ends))
+    out = np.empty(int(new_offsets[-1]), dtype=np.uint8)
+    keep = np.ones(len(out), dtype=bool)
+    for i, byte in enumerate(suffix):
+        positions = ends - len(suffix) + i
+        out[positions] = byte
+        keep[positions] = False
+    out[keep] = np.frombuffer(data, dtype=np.uint8)[offsets[0]:offsets[-1]]
+    return array('q', new_offsets.tobytes()), out.tobytes()
+
+
+def transform_buffer(offsets, data, case='upper', suffix=b''):
+    if data.isascii():
+        convert = _BYTE_CASES[case]
+        if convert is not None:
+            data = convert(data)
+        if suffix:
+            return _append_suffix(offsets, data, suffix)
+        return array('q', offsets), data
+    # Non-ASCII characters can change length when their case changes, so
+    # decode, convert and re-encode string by string.
+    texts = [data[offsets[i]:offsets[i + 1]].decode() for i in range(len(offsets) - 1)]
+    encoded = [text.encode() for text in transform_batch(texts, case, suffix.decode())]
+    new_offsets = array('q', [0])
+    for text in encoded:
+        new_offsets.append(new_offsets[-1] + len(text))
+    return new_offsets, b''.join(encoded)
+
+
+def transform_stream(texts, case='upper', suffix='', chunk_size=4096):
+    texts = iter(texts)
+    while chunk := list(islice(texts, chunk_size)):
+        yield from transform_batch(chunk, case, suffix)
+
+
+def yell_batch(texts):
+    return transform_batch(texts, 'upper', '!')
+
+
+def whisper_batch(texts):
+    return transform_batch(texts, 'lower', '...')
+
+if __name__ == '__main__':
+    print(yell_batch(['hello', 'wow']), whisper_batch(['Hi there']))
 
 # Key Takeaways
 # • Everything in Python is an object, including functions. You can
@@ -148,15 +387,18 @@ print(callable(plus_3))
 # whenever function objects are required.
 
 add = lambda x,y: x + y
-print(add(5,3))
+if __name__ == '__main__':
+    print(add(5,3))
 
 # You could declare the same add function with the def keyword, but it
 # would be slightly more verbose:
 def add(x,y):
     return x + y
-print(add(5,3))
+if __name__ == '__main__':
+    print(add(5,3))
 
-print((lambda x,y: x + y)(5, 3))
+if __name__ == '__main__':
+    print((lambda x,y: x + y)(5, 3))
 # Conceptually, the lambda expression lambda x, y: x + y is the
 # same as declaring a function with def, but just written inline. The
 # key difference here is that I didn’t have to bind the function object to
@@ -0,0 +1,187 @@
+# Running a chain of functions concurrently
+# In effective_functions.py we stored functions in a list and applied
+# them one after the other:
+#     funcs = [bark, str.lower, str.capitalize]
+#     for f in funcs:
+#         print(f('Hey there'))
+# Chaining them, so every message goes through all the functions in
+# order, is a common way to build a processing pipeline. Done in a plain
+# loop though, a slow stage (say one that waits on the network) holds up
+# everything behind it.
+# FunctionPipeline gives every stage its own pool of worker threads and
+# connects the stages with bounded queues. While stage 2 works on one
+# batch, stage 1 can already work on the next, so stages that spend their
+# time waiting on I/O overlap. The queues being bounded means a fast stage
+# can only get queue_size batches ahead of a slow one before it has to
+# wait (backpressure), so memory stays bounded too. With ordered=True the
+# batches that finished early wait for the ones before them, so there the
+# feeder also stops once queue_size batches per worker thread are still
+# on their way out.
+# Messages travel in batches of batch_size to keep the queue overhead
+# down. With ordered=True the results come out in input order, otherwise
+# in whatever order the batches finish. Each stage keeps count of the
+# items it processed, how long it was busy and the longest queue it saw.
+# Threads only help when the stages wait on I/O or release the GIL; for
+# pure Python number crunching see parallel_comprehension in
+# list_comprehension.py instead.
+
+import queue
+import threading
+import time
+from itertools import islice
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class StageStats:
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, items, seconds, queue_depth):
+        with self._lock:
+            self.items += items
+            self.batches += 1
+            self.busy_seconds += seconds
+            self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+    def items_per_second(self):
+        # Per worker thread, while busy.
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+    def __repr__(self):
+        return (f'StageStats({self.name!r}, items={self.items}, batches={self.batches}, '
+                f'busy_seconds={self.busy_seconds:.3f}, max_queue_depth={self.max_queue_depth})')
+
+
+class FunctionPipeline:
+    def __init__(self, stages, workers=1, queue_size=16, batch_size=64, ordered=True):
+        # A stage is either a function, or a (function, workers) pair to
+        # give that stage its own number of threads.
+        self.stages = [stage if isinstance(stage, tuple) else (stage, workers) for stage in stages]
+        if not self.stages:
+            raise ValueError('a pipeline needs at least one stage')
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self.stats = [StageStats(getattr(func, '__name__', repr(func)), n) for func, n in self.stages]
+
+    def run(self, items):
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors = []
+        # Batches fed in but not yet handed out in order (queue_size=0
+        # means unbounded queues, as with queue.Queue).
+        limit_in_flight = self.ordered and self.queue_size > 0
+        in_flight = threading.Semaphore(self.queue_size * sum(n for _, n in self.stages))
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        def acquire():
+            while not stop.is_set():
+                if in_flight.acquire(timeout=_POLL_SECONDS):
+                    return True
+            return False
+
+        def feed():
+            it = iter(items)
+            seq = 0
+            try:
+                while batch := list(islice(it, self.batch_size)):
+                    if limit_in_flight and not acquire():
+                        return
+                    if not put(queues[0], (seq, batch)):
+                        return
+                    seq += 1
+            except BaseException as exc:
+                errors.append(exc)
+                stop.set()
+                return
+            for _ in range(self.stages[0][1]):
+                put(queues[0], _DONE)
+
+        def work(index, func, remaining):
+            inbox, outbox, stats = queues[index], queues[index + 1], self.stats[index]
+            while (item := get(inbox)) is not _DONE:
+                seq, batch = item
+                start = time.perf_counter()
+                try:
+                    results = [func(x) for x in batch]
+                except BaseException as exc:
+                    errors.append(exc)
+                    stop.set()
+                    return
+                stats.record(len(batch), time.perf_counter() - start, inbox.qsize())
+                if not put(outbox, (seq, results)):
+                    return
+            # The last worker of this stage to finish tells the next stage
+            # (or the consumer) that nothing more is coming.
+            with remaining[1]:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                downstream = self.stages[index + 1][1] if index + 1 < len(self.stages) else 1
+                for _ in range(downstream):
+                    put(outbox, _DONE)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for index, (func, n) in enumerate(self.stages):
+            remaining = [n, threading.Lock()]
+            threads += [threading.Thread(target=work, args=(index, func, remaining), daemon=True)
+                        for _ in range(n)]
+        for thread in threads:
+            thread.start()
+
+        pending, next_seq = {}, 0
+        try:
+            while (item := get(queues[-1])) is not _DONE:
+                seq, results = item
+                if not self.ordered:
+                    yield from results
+                    continue
+                pending[seq] = results
+                while next_seq in pending:
+                    yield from pending.pop(next_seq)
+                    next_seq += 1
+                    if limit_in_flight:
+                        in_flight.release()
+            if errors:
+                raise errors[0]
+        finally:
+            # Also reached when the caller stops iterating early: let all
+            # the threads wind down.
+            stop.set()
+
+
+if __name__ == '__main__':
+    def fetch(text):
+        time.sleep(0.01)   # pretend to wait on the network
+        return text
+
+    pipeline = FunctionPipeline([(fetch, 8), str.lower, str.capitalize], batch_size=4)
+    start = time.perf_counter()
+    messages = list(pipeline.run(f'HEY THERE {i}' for i in range(200)))
+    print(messages[:3], f'{time.perf_counter() - start:.2f}s')
+    for stats in pipeline.stats:
+        print(stats)
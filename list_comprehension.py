@@ -10,8 +10,9 @@ squares = [x*x for x in range(10)]
 
 #using conditions inside list comprehension
 even_squares = [x * x for x in range(10) if x % 2 == 0]
-print(squares)
-print(even_squares)
+if __name__ == '__main__':
+    print(squares)
+    print(even_squares)
 
 # Key Takeaways
 # • Comprehensions are a key feature in Python. Understanding
@@ -21,4 +22,197 @@ print(even_squares)
 # loop pattern. Once you understand the pattern, you’ll develop
 
 # an intuitive understanding for comprehensions.
-# • There are more than just list comprehensions.
\ No newline at end of file
+# • There are more than just list comprehensions.
+
+
+# Lazy pipelines
+# squares and even_squares above are built as complete lists. For
+# range(10) that's nothing, but for range(500_000_000) the list alone
+# won't fit in memory. Swapping the square brackets for parentheses gives
+# you a generator expression that produces one value at a time instead:
+#     even_squares = (x * x for x in range(10) if x % 2 == 0)
+# Pipeline wraps the same idea in map/filter/take stages you can chain.
+# Nothing runs until you iterate over it, and then all the stages are
+# applied to each item in a single loop over the source (no generator
+# per stage).
+# If NumPy is installed and the source is a plain range, .chunks() hands
+# the stages whole np.arange blocks instead of single ints. That works
+# for expressions like x * x and x % 2 == 0, which NumPy evaluates
+# element-wise, and keeps memory bounded by the block size. (Keep in mind
+# that NumPy integers are 64-bit and can overflow where Python ints won't.)
+
+from itertools import islice
+
+_MAP, _FILTER, _TAKE = 'map', 'filter', 'take'
+
+
+class Pipeline:
+    def __init__(self, source, stages=()):
+        self.source = source
+        self.stages = tuple(stages)
+
+    def map(self, func):
+        return Pipeline(self.source, self.stages + ((_MAP, func),))
+
+    def filter(self, predicate):
+        return Pipeline(self.source, self.stages + ((_FILTER, predicate),))
+
+    def take(self, n):
+        return Pipeline(self.source, self.stages + ((_TAKE, n),))
+
+    def __iter__(self):
+        stages = [[kind, arg] for kind, arg in self.stages]
+        if any(kind is _TAKE and n <= 0 for kind, n in stages):
+            return
+        for item in self.source:
+            # Once a take stage has let its last item through, nothing
+            # after this item can make it out of the pipeline.
+            exhausted = False
+            for stage in stages:
+                kind, arg = stage
+                if kind is _MAP:
+                    item = arg(item)
+                elif kind is _FILTER:
+                    if not arg(item):
+                        break
+                else:
+                    stage[1] -= 1
+                    exhausted = exhausted or stage[1] == 0
+            else:
+                yield item
+            if exhausted:
+                return
+
+    def chunks(self, size=1 << 16):
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is None or not isinstance(self.source, range):
+            items = iter(self)
+            while chunk := list(islice(items, size)):
+                yield chunk
+            return
+        remaining = [n for kind, n in self.stages if kind is _TAKE]
+        for start in range(0, len(self.source), size):
+            part = self.source[start:start + size]
+            block = np.arange(part.start, part.stop, part.step)
+            take_index = 0
+            for kind, arg in self.stages:
+                if kind is _MAP:
+                    block = arg(block)
+                elif kind is _FILTER:
+                    block = block[np.asarray(arg(block), dtype=bool)]
+                else:
+                    block = block[:max(remaining[take_index], 0)]
+                    remaining[take_index] -= len(block)
+                    take_index += 1
+            if len(block):
+                yield block
+            if any(n <= 0 for n in remaining):
+                return
+
+
+lazy_even_squares = Pipeline(range(10)).filter(lambda x: x % 2 == 0).map(lambda x: x * x)
+if __name__ == '__main__':
+    print(list(lazy_even_squares))
+    print(list(Pipeline(range(10**12)).map(lambda x: x * x).take(3)))
+
+# Compare memory and time with the eager list comprehension:
+# import time, tracemalloc
+# for name, build in [
+#         ('list', lambda: sum([x * x for x in range(10**7) if x % 2 == 0])),
+#         ('pipeline', lambda: sum(Pipeline(range(10**7)).filter(lambda x: x % 2 == 0).map(lambda x: x * x))),
+#         ('numpy', lambda: sum(int(c.sum()) for c in Pipeline(range(10**7)).filter(lambda x: x % 2 == 0).map(lambda x: x * x).chunks()))]:
+#     tracemalloc.start()
+#     start = time.perf_counter()
+#     build()
+#     print(name, time.perf_counter() - start, tracemalloc.get_traced_memory()[1])
+#     tracemalloc.stop()
+
+
+# Spreading a comprehension over several cores
+# [x * x for x in range(10) if x % 2 == 0] runs on a single core. When
+# the expression is expensive and the collection is big, we can cut the
+# collection into chunks and let a ProcessPoolExecutor evaluate the
+# chunks in parallel.
+# Sending work to another process isn't free though: the chunk and its
+# results have to be pickled on the way there and back. So we first time
+# the expression on a small probe from the start of the collection. If
+# the whole job would be done in a few milliseconds anyway, we just
+# finish it here. Otherwise the chunk size is picked so that each chunk
+# takes roughly CHUNK_SECONDS to compute, with at least a few chunks per
+# worker so they stay busy.
+# The expression and predicate get pickled too, so they have to be
+# module-level functions (like square and is_even below), not lambdas.
+
+import math
+import os
+import time
+from functools import partial
+
+PROBE_SIZE = 64
+SERIAL_SECONDS = 0.05
+CHUNK_SECONDS = 0.02
+
+
+def square(x):
+    return x * x
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def _evaluate(expression, predicate, chunk):
+    if predicate is None:
+        return [expression(x) for x in chunk]
+    return [expression(x) for x in chunk if predicate(x)]
+
+
+def parallel_stream(expression, collection, predicate=None, ordered=True, workers=None):
+    items = collection if isinstance(collection, (list, tuple, range)) else list(collection)
+    workers = workers or os.cpu_count() or 1
+    evaluate = partial(_evaluate, expression, predicate)
+
+    # Time the probe before handing out its results, otherwise we'd also
+    # be timing whatever the consumer does between items.
+    start = time.perf_counter()
+    probe = evaluate(items[:PROBE_SIZE])
+    seconds_per_item = (time.perf_counter() - start) / max(min(len(items), PROBE_SIZE), 1)
+    yield from probe
+    rest = items[PROBE_SIZE:]
+    if not rest:
+        return
+    if workers == 1 or seconds_per_item * len(rest) < SERIAL_SECONDS:
+        yield from evaluate(rest)
+        return
+
+    # concurrent.futures pulls in multiprocessing, so only import it once
+    # we know we're going to need it.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    chunk_size = max(1, min(int(CHUNK_SECONDS / max(seconds_per_item, 1e-9)),
+                            math.ceil(len(rest) / (workers * 4))))
+    chunks = [rest[i:i + chunk_size] for i in range(0, len(rest), chunk_size)]
+    pool = ProcessPoolExecutor(workers)
+    try:
+        if ordered:
+            results = pool.map(evaluate, chunks)
+        else:
+            results = (future.result() for future in
+                       as_completed([pool.submit(evaluate, chunk) for chunk in chunks]))
+        for result in results:
+            yield from result
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def parallel_comprehension(expression, collection, predicate=None, workers=None):
+    return list(parallel_stream(expression, collection, predicate, workers=workers))
+
+if __name__ == '__main__':
+    print(parallel_comprehension(square, range(10), is_even))
+
+# parallel_stream(..., ordered=False) yields results as soon as any chunk
+# is done, in whatever order the chunks finish.
@@ -10,7 +10,8 @@
 a = 6
 b = 5
 
-print(f"Six plus 5 equals {6+5} and not {2* (a+b)}")
+if __name__ == '__main__':
+    print(f"Six plus 5 equals {6+5} and not {2* (a+b)}")
 
 
 # BEHIND THE SCENES
@@ -37,7 +38,8 @@ question + "?")
 name = "bob"
 from string import Template
 t = Template('Hey, $name!')
-t.substitute(name=name)
+if __name__ == '__main__':
+    t.substitute(name=name)
 
 # Another difference is that template strings don’t allow format speci-
 # fiers. So in order to get our error string example to work, we need to
@@ -63,4 +65,233 @@ t.substitute(name=name)
 # String Interpolation if you’re on Python 3.6+, and “New
 # Style” String Formatting if you’re not.
 
+# Compiling user templates once
+# Every Template('Hey, $name!').substitute(...) call scans the format
+# string with a regular expression again, even if we've seen the exact
+# same template a million times before. Since the template only changes
+# when the user changes it, we can parse it once, keep the parsed form
+# around and reuse it for every render.
+# compile_template splits the template into its literal text and its
+# placeholder names, and from those generates a small render function
+# whose body is a single f-string, e.g. for 'Hey, $name!' roughly
+#     def render(m, _l0='Hey, ', _n0='name', _l1='!'):
+#         return f'{_l0}{m[_n0]!s}{_l1}'
+# The user's text and names only ever end up as constant default values,
+# never in the generated source, so just like Template nothing in a user
+# template can reach attributes, indexes or any other Python expression.
+# The last few hundred compiled templates are kept in an LRU cache keyed
+# by the template source.
+
+import functools
+
+
+class CompiledTemplate:
+    def __init__(self, source):
+        self.source = source
+        literals, names = [''], []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literals[-1] += source[position:match.start()]
+            position = match.end()
+            if match.group('escaped') is not None:
+                literals[-1] += Template.delimiter
+                continue
+            name = match.group('named') or match.group('braced')
+            if name is None:
+                raise ValueError(f'Invalid placeholder in string at position {match.start()}')
+            names.append(name)
+            literals.append('')
+        literals[-1] += source[position:]
+        self.literals = tuple(literals)
+        self.names = tuple(names)
+
+        constants = {f'_l{i}': literal for i, literal in enumerate(literals)}
+        constants.update((f'_n{i}', name) for i, name in enumerate(names))
+        fields = ['{_l0}']
+        for i in range(len(names)):
+            # !s so values go through str() like in Template, not format().
+            fields.append(f'{{m[_n{i}]!s}}{{_l{i + 1}}}')
+        body = "f'" + ''.join(fields) + "'"
+        params = ', '.join(f'{key}={key}' for key in constants)
+        namespace = dict(constants)
+        exec(f'def render(m, {params}):\n'
+             f'    return {body}\n'
+             f'def render_many(rows, {params}):\n'
+             f'    for m in rows:\n'
+             f'        yield {body}\n', namespace)
+        self._render = namespace['render']
+        self._render_many = namespace['render_many']
+
+    def render(self, mapping=None, /, **kws):
+        # Only merge when we got both a mapping and keywords.
+        if not kws:
+            return self._render({} if mapping is None else mapping)
+        if not mapping:
+            return self._render(kws)
+        return self._render({**mapping, **kws})
+
+    def render_many(self, rows):
+        # A generator, so rendered rows can be streamed out one by one.
+        return self._render_many(rows)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(source):
+    return CompiledTemplate(source)
+
+
+# render() is the one called over and over with the same few templates,
+# so it keeps the generated render functions in a plain dict. A dict
+# lookup is cheaper than going through the lru_cache and then the
+# CompiledTemplate.render method on every call.
+_render_functions = {}
+
+
+def render(source, mapping=None, /, **kws):
+    try:
+        render_function = _render_functions[source]
+    except KeyError:
+        if len(_render_functions) >= 256:
+            _render_functions.clear()
+        render_function = _render_functions[source] = compile_template(source)._render
+    if not kws:
+        return render_function({} if mapping is None else mapping)
+    if not mapping:
+        return render_function(kws)
+    return render_function({**mapping, **kws})
+
+
+def render_many(source, rows):
+    return compile_template(source).render_many(rows)
+
+if __name__ == '__main__':
+    render('Hey, $name!', name=name)
+# for line in render_many('Hey, $name! You owe ${amount}$$.', rows):
+#     out.write(line + '\n')
+
+# Let's see how much the compiled version saves:
+# import timeit
+# print(timeit.timeit(lambda: Template('Hey, $name!').substitute(name=name), number=1_000_000))
+# print(timeit.timeit(lambda: render('Hey, $name!', name=name), number=1_000_000))
+# rows = [{'name': str(i)} for i in range(1_000_000)]
+# print(timeit.timeit(lambda: list(render_many('Hey, $name!', rows)), number=1))
+
+# Streaming output
+# greet() builds its result with + (or an f-string), and the strong and
+# emphasis decorators in decorators_.py do the same. That's perfectly fine
+# for one greeting. But if you glue millions of them together into one big
+# report string before writing it out, all those intermediate strings have
+# to live in memory at the same time.
+# Instead we can produce the lines lazily with a generator and write them
+# straight to wherever they're going: an io.StringIO, an open file, or a
+# socket (sock.makefile('w') gives you a writer). write_lines joins a
+# fixed number of lines per write() call, so memory use stays bounded by
+# the chunk size no matter how many rows there are.
+
+from itertools import islice
+
+
+def greetings(rows, prefix='', suffix=''):
+    # prefix/suffix let you wrap every greeting in tags, e.g.
+    # greetings(rows, '<strong><em>', '</em></strong>')
+    return (f"{prefix}Hello, {name}! How's it {question}?{suffix}" for name, question in rows)
+
+
+def write_lines(out, lines, chunk_size=1024):
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            break
+        chunk.append('')
+        out.write('\n'.join(chunk))
+
+# import io
+# buffer = io.StringIO()
+# write_lines(buffer, greetings([('Bob', 'going'), ('Alice', 'hanging')], '<em>', '</em>'))
+# with open('report.txt', 'w') as f:
+#     write_lines(f, greetings((str(i), 'going') for i in range(10_000_000)))
+# write_lines(f, render_many('Hey, $name!', rows)) works just the same.
+
+# Format specifiers, compiled once
+# Template strings can't do format specifiers, so for our error example
+# the number has to be turned into hex by hand. "New style" format
+# strings can ('{errno:#x}', '{latency:.3f}'), but str.format parses the
+# format string again on every call, which shows when you format millions
+# of log lines.
+# compile_format does for str.format strings what compile_template does
+# for templates: it parses the format string once (with
+# string.Formatter().parse) and generates a render function whose body
+# is one f-string, with each field's format spec and conversion already
+# in place. For '{errno:#x} took {latency:.3f}s' that's roughly
+#     def render(r, _k0='errno', _s0='#x', _k1='latency', _s1='.3f', ...):
+#         return f'{r[_k0]:{_s0}} took {r[_k1]:{_s1}}s'
+# Named fields are looked up in dict rows, numbered fields ('{0}', '{1}'
+# or '{}') index into tuple rows. Attribute and index lookups in field
+# names ('{user.name}', '{a[0]}') and nested fields inside a spec are not
+# supported, so a format string can't reach anything but the row itself.
+
+from string import Formatter
+
+
+class CompiledFormat:
+    def __init__(self, fmt):
+        self.format_string = fmt
+        constants, fields = {}, []
+        auto_index, manual = 0, False
+        for i, (literal, field, spec, conversion) in enumerate(Formatter().parse(fmt)):
+            if literal:
+                constants[f'_l{i}'] = literal
+                fields.append(f'{{_l{i}}}')
+            if field is None:
+                continue
+            # Like str.format, '{}' and '{0}' can't be mixed in one string.
+            if field == '':
+                if manual:
+                    raise ValueError('cannot switch from manual field specification '
+                                     'to automatic field numbering')
+                key, auto_index = auto_index, auto_index + 1
+            elif field.isdecimal():
+                if auto_index:
+                    raise ValueError('cannot switch from automatic field numbering '
+                                     'to manual field specification')
+                key, manual = int(field), True
+            elif field.isidentifier():
+                key = field
+            else:
+                raise ValueError(f'unsupported field {field!r} in {fmt!r}')
+            if '{' in spec:
+                raise ValueError(f'nested fields in format specs are not supported in {fmt!r}')
+            constants[f'_k{i}'] = key
+            if conversion and conversion not in ('r', 's', 'a'):
+                raise ValueError(f'unknown conversion {conversion!r} in {fmt!r}')
+            expression = f'r[_k{i}]' + (f'!{conversion}' if conversion else '')
+            if spec:
+                constants[f'_s{i}'] = spec
+                expression += f':{{_s{i}}}'
+            fields.append('{' + expression + '}')
+        params = ''.join(f', {key}={key}' for key in constants)
+        namespace = dict(constants)
+        exec(f"def render(r{params}):\n    return f'{''.join(fields)}'\n", namespace)
+        self.render = namespace['render']
+
+    def render_many(self, rows, sep='\n'):
+        return sep.join(map(self.render, rows))
+
+    def render_columns(self, *columns, sep='\n'):
+        return sep.join(map(self.render, zip(*columns)))
+
+    def write_many(self, out, rows, chunk_size=1024):
+        write_lines(out, map(self.render, rows), chunk_size)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_format(fmt):
+    return CompiledFormat(fmt)
+
+if __name__ == '__main__':
+    log_line = compile_format('{name}: error {errno:#x} after {latency:.3f}s')
+    print(log_line.render({'name': name, 'errno': 50159747054, 'latency': 0.25}))
+    print(compile_format('{:>6} | {:.1%}').render_columns(['bob', 'alice'], [0.5, 0.25]))
+
 #GOTO Zen of python.py
\ No newline at end of file
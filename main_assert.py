@@ -25,7 +25,8 @@ shoes = {'name': 'Fancy Shoes', 'price': 14900}
 # apply_discount(shoes, 0.25)
 
 #let’s try to apply some invalid discounts.
-apply_discount(shoes, 2.0)
+if __name__ == '__main__':
+    apply_discount(shoes, 2.0)
 
 #This speeds up debugging efforts considerably, and it will make your
 # programs more maintainable in the long-run. And that, my friend, is
@@ -36,4 +37,122 @@ apply_discount(shoes, 2.0)
 # signal expected error conditions, like a File-Not-Found error, where
 # a user can take corrective actions or just try again.
 
+
+# Checks that don't disappear with python -O
+# There's one big caveat with assert: running Python with -O (or with
+# PYTHONOPTIMIZE set) strips every assert statement out of the program.
+# If you run your production code that way for speed, the price check in
+# apply_discount silently stops happening.
+# PriceValidation does the same check with a plain if-statement, so the
+# interpreter flag doesn't affect it, and lets you decide at runtime how
+# much checking you want to pay for:
+#   'full'     checks every price,
+#   'sampled'  checks one price in every `every` (1 in N calls, or every
+#              Nth row of a batch),
+#   'off'      checks nothing.
+# A failed check still raises AssertionError, so code that handled the
+# assert before handles this the same way.
+
+import sys
+from array import array
+from itertools import islice
+
+FULL, SAMPLED, OFF = 'full', 'sampled', 'off'
+MAX_REPORTED_ROWS = 10
+
+
+class PriceValidation:
+    def __init__(self, mode=FULL, every=100):
+        self.configure(mode, every)
+
+    def configure(self, mode, every=None):
+        if mode not in (FULL, SAMPLED, OFF):
+            raise ValueError(f'unknown validation mode {mode!r}')
+        if every is not None:
+            if every < 1:
+                raise ValueError('every must be at least 1')
+            self.every = every
+        self.mode = mode
+        self._countdown = self.every
+
+    def check(self, price, original_price):
+        if self.mode != FULL:
+            if self.mode == OFF:
+                return
+            self._countdown -= 1
+            if self._countdown:
+                return
+            self._countdown = self.every
+        if not 0 <= price <= original_price:
+            raise AssertionError(f'invalid discounted price {price} for original price {original_price}')
+
+    def check_batch(self, prices, original_prices):
+        if self.mode == OFF:
+            return
+        step = self.every if self.mode == SAMPLED else 1
+        # If prices is a NumPy array then NumPy has already been imported.
+        np = sys.modules.get('numpy')
+        if np is not None and isinstance(prices, np.ndarray):
+            new, old = prices[::step], np.asarray(original_prices)[::step]
+            bad = (np.flatnonzero((new < 0) | (new > old)) * step).tolist()
+        else:
+            rows = range(0, len(prices), step)
+            bad = [i for i, new, old in zip(rows, islice(prices, 0, None, step),
+                                            islice(original_prices, 0, None, step))
+                   if not 0 <= new <= old]
+        if bad:
+            # Only name the first few rows in the message; all of them are
+            # on error.rows.
+            shown = ', '.join(map(str, bad[:MAX_REPORTED_ROWS]))
+            if len(bad) > MAX_REPORTED_ROWS:
+                shown += f' and {len(bad) - MAX_REPORTED_ROWS} more'
+            error = AssertionError(f'invalid discounted price in rows [{shown}]')
+            error.rows = bad
+            raise error
+
+
+validation = PriceValidation()
+
+
+def apply_discount_checked(product, discount):
+    price = int(product['price'] * (1.0 - discount))
+    validation.check(price, product['price'])
+    return price
+
+# validation.configure(SAMPLED, every=1000)
+# apply_discount_checked(shoes, 2.0)   # only every 1000th call gets checked
+
+
+# Repricing a whole catalog at once
+# apply_discount works on one product dict per call and checks its result
+# every time. When you reprice millions of products it's much cheaper to
+# keep the prices and discounts as columns (an array('q') of cents and an
+# array('d') of discounts, or NumPy arrays) and do the work in one pass.
+# The bounds check turns into a vector check as well
+# (validation.check_batch): instead of stopping at the first bad product
+# it collects the indexes of all the bad rows. They're attached to the
+# AssertionError as error.rows; the message only lists the first few.
+# The truncation is the same int(price * (1.0 - discount)) as above, so
+# the batch results match the scalar function exactly.
+
+
+def apply_discount_batch(prices, discounts):
+    if len(prices) != len(discounts):
+        raise ValueError('prices and discounts must have the same length')
+    # If prices is a NumPy array then NumPy has already been imported.
+    np = sys.modules.get('numpy')
+    if np is not None and isinstance(prices, np.ndarray):
+        prices = prices.astype(np.int64, copy=False)
+        discounted = (prices * (1.0 - np.asarray(discounts, dtype=np.float64))).astype(np.int64)
+    else:
+        discounted = array('q', [int(p * (1.0 - d)) for p, d in zip(prices, discounts)])
+    validation.check_batch(discounted, prices)
+    return discounted
+
+# prices = array('q', [14900, 2500, 999])
+# discounts = array('d', [0.25, 0.1, 2.0])
+# apply_discount_batch(prices, discounts)
+# AssertionError: invalid discounted price in rows [2]
+# (the caught error has error.rows == [2])
+
 #GOTO literal_string_interpolation
\ No newline at end of file
@@ -0,0 +1,173 @@
+# A product catalog on disk
+# main_assert.py keeps a product as a small dict:
+#     {'name': 'Fancy Shoes', 'price': 14900}
+# That's easy to read, but every dict, name string and price int is its
+# own Python object, and with millions of products those objects cost
+# gigabytes. Most of the time we only need the prices in one place
+# anyway, so this module stores a catalog as columns in one file:
+#   header        magic, row count, index size
+#   prices        one int64 per row (cents)
+#   name offsets  row count + 1 int64s; name i is name_blob[off[i]:off[i+1]]
+#   name index    hash table of row numbers (-1 = empty), to find a row by name
+#   name blob     all names, UTF-8 encoded, back to back
+# Catalog opens the file with mmap, so nothing is read until it's used,
+# and prices is a memoryview straight into the file (or a NumPy array
+# over the same memory with numpy_prices()). Repricing writes the new
+# prices back into that column and leaves everything else untouched.
+# The name index uses crc32 instead of Python's hash(): hash() of a string
+# changes from one interpreter run to the next, so it can't be stored.
+# All numbers, header included, are stored in the machine's native byte
+# order, which is what lets the columns be used straight from the mmap.
+# The flip side is that a catalog written on a little-endian machine
+# can't be read on a big-endian one.
+
+import mmap
+import struct
+import zlib
+from array import array
+
+from main_assert import apply_discount_batch
+
+MAGIC = b'PRODCAT1'
+HEADER = struct.Struct('=8sqq')
+
+
+def _index_size(rows):
+    # A power of two at least twice the number of rows keeps the probe
+    # chains short.
+    size = 1
+    while size < 2 * rows:
+        size *= 2
+    return size
+
+
+def _slot(name_bytes, size):
+    return zlib.crc32(name_bytes) & (size - 1)
+
+
+def write_catalog(path, products):
+    names, prices = [], array('q')
+    for product in products:
+        names.append(product['name'].encode())
+        prices.append(product['price'])
+
+    offsets = array('q', [0])
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+
+    index = array('q', [-1]) * _index_size(len(names))
+    for row, name in enumerate(names):
+        slot = _slot(name, len(index))
+        while index[slot] != -1:
+            if names[index[slot]] == name:
+                raise ValueError(f'duplicate product name {name.decode()!r}')
+            slot = (slot + 1) & (len(index) - 1)
+        index[slot] = row
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(names), len(index)))
+        f.write(prices.tobytes())
+        f.write(offsets.tobytes())
+        f.write(index.tobytes())
+        f.write(b''.join(names))
+
+
+class Catalog:
+    def __init__(self, path, writable=False):
+        self._file = open(path, 'r+b' if writable else 'rb')
+        self._map = None
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+            if len(self._map) < HEADER.size:
+                raise ValueError(f'{path} is not a product catalog')
+            magic, rows, index_size = HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a product catalog')
+            if rows < 0 or index_size < 1 or len(self._map) < HEADER.size + 8 * (2 * rows + 1 + index_size):
+                raise ValueError(f'{path} is truncated or damaged')
+        except BaseException:
+            # mmap() itself fails on an empty file.
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise
+        self.rows = rows
+        view = memoryview(self._map)
+        start = HEADER.size
+        self.prices = view[start:start + 8 * rows].cast('q')
+        start += 8 * rows
+        self._offsets = view[start:start + 8 * (rows + 1)].cast('q')
+        start += 8 * (rows + 1)
+        self._index = view[start:start + 8 * index_size].cast('q')
+        start += 8 * index_size
+        self._names = view[start:]
+
+    def __len__(self):
+        return self.rows
+
+    def name(self, row):
+        return bytes(self._names[self._offsets[row]:self._offsets[row + 1]]).decode()
+
+    def row(self, name):
+        name_bytes = name.encode()
+        size = len(self._index)
+        slot = _slot(name_bytes, size)
+        while (row := self._index[slot]) != -1:
+            if self._names[self._offsets[row]:self._offsets[row + 1]] == name_bytes:
+                return row
+            slot = (slot + 1) & (size - 1)
+        raise KeyError(name)
+
+    def product(self, row):
+        # Builds the dict form from main_assert.py, for when you do want one.
+        return {'name': self.name(row), 'price': self.prices[row]}
+
+    def numpy_prices(self):
+        import numpy as np
+        return np.frombuffer(self.prices, dtype=np.int64)
+
+    def reprice(self, discounts):
+        # Same calculation and checks as apply_discount_batch; only the
+        # price column is written back. With NumPy the whole column is
+        # done in one go, straight on the mapped file.
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is None:
+            self.prices[:] = apply_discount_batch(self.prices, discounts)
+        else:
+            prices = self.numpy_prices()
+            prices[:] = apply_discount_batch(prices, discounts)
+        self._map.flush()
+
+    def close(self):
+        # Arrays from numpy_prices() still point into the mapping, so drop
+        # them first or this raises BufferError. The file gets closed
+        # either way.
+        try:
+            for view in (self.prices, self._offsets, self._index, self._names):
+                view.release()
+            self._map.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), 'catalog.bin')
+    write_catalog(path, [{'name': 'Fancy Shoes', 'price': 14900},
+                         {'name': 'Plain Socks', 'price': 499}])
+    with Catalog(path, writable=True) as catalog:
+        catalog.reprice(array('d', [0.25, 0.1]))
+        shoes = catalog.row('Fancy Shoes')
+        print(catalog.product(shoes), catalog.prices.tolist())
@@ -0,0 +1,90 @@
+# All the tricks in one place
+# Every lesson in this repo is a standalone script: run it with python and
+# it shows you its examples. Importing a lesson doesn't run those examples
+# (they sit behind if __name__ == '__main__':), so you can also use the
+# helpers from your own code.
+# This module collects them in one namespace. It doesn't import anything
+# up front though. Python 3.7 added module-level __getattr__ (PEP 562):
+# it's called whenever an attribute isn't found on the module, so we can
+# import the lesson that defines it right then, the first time somebody
+# asks for it. `import tricks` costs next to nothing, and
+# `tricks.memoize` only pays for importing decorators_.
+# The lessons themselves are reachable too, e.g. tricks.args_kwargs is
+# 6_args_kwargs.py (a module name can't start with a digit in an import
+# statement, but importlib doesn't mind).
+
+import importlib
+
+_MODULES = {
+    'args_kwargs': '6_args_kwargs',
+    'decorators': 'decorators_',
+    'effective_functions': 'effective_functions',
+    'function_pipeline': 'function_pipeline',
+    'list_comprehension': 'list_comprehension',
+    'literal_string_interpolation': 'literal_string_interpolation',
+    'main_assert': 'main_assert',
+    'product_catalog': 'product_catalog',
+    'safe_expressions': 'safe_expressions',
+    'zen_of_python': 'zen_of_python',
+}
+
+_EXPORTS = {
+    'foo': '6_args_kwargs',
+    'null_decorator': 'decorators_',
+    'uppercase': 'decorators_',
+    'strong': 'decorators_',
+    'emphasis': 'decorators_',
+    'compose': 'decorators_',
+    'memoize': 'decorators_',
+    'make_key': 'decorators_',
+    'exact_wrapper': 'decorators_',
+    'instrument': 'decorators_',
+    'incremental': 'decorators_',
+    'Source': 'decorators_',
+    'yell': 'effective_functions',
+    'make_adder': 'effective_functions',
+    'Adder': 'effective_functions',
+    'CompactAdder': 'effective_functions',
+    'AdderTable': 'effective_functions',
+    'SpeakDispatcher': 'effective_functions',
+    'transform_batch': 'effective_functions',
+    'transform_buffer': 'effective_functions',
+    'transform_stream': 'effective_functions',
+    'FunctionPipeline': 'function_pipeline',
+    'Pipeline': 'list_comprehension',
+    'parallel_comprehension': 'list_comprehension',
+    'parallel_stream': 'list_comprehension',
+    'compile_format': 'literal_string_interpolation',
+    'compile_template': 'literal_string_interpolation',
+    'render': 'literal_string_interpolation',
+    'render_many': 'literal_string_interpolation',
+    'greetings': 'literal_string_interpolation',
+    'write_lines': 'literal_string_interpolation',
+    'apply_discount': 'main_assert',
+    'apply_discount_batch': 'main_assert',
+    'apply_discount_checked': 'main_assert',
+    'PriceValidation': 'main_assert',
+    'validation': 'main_assert',
+    'Catalog': 'product_catalog',
+    'write_catalog': 'product_catalog',
+    'compile_expression': 'safe_expressions',
+    'evaluate_rules': 'safe_expressions',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        value = importlib.import_module(_MODULES[name])
+    elif name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    # Cache it on the module so __getattr__ isn't called again for it.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES) | set(_EXPORTS))
@@ -6,7 +6,8 @@
 # an Easter egg in the language. Just enter a Python interpreter session
 # and run the following:
 
-import this
+if __name__ == '__main__':
+    import this
 
 
 #Goto effective_functions.py
\ No newline at end of file